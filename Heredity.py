@@ -1,55 +1,139 @@
-def joint_probability(people, one_gene, two_genes, have_trait):
-    """Calculate joint probability of genetic inheritance and traits"""
-    prob = 1
+import itertools
+import math
+import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from string import ascii_letters
+
+import numpy as np
+
+# Tables derived from PROBS: gene[g], inherit[mother_g][father_g][child_g]
+# and trait[g][has_trait]
+Tables = namedtuple("Tables", ["gene", "inherit", "trait"])
+_tables = None
+_tables_key = None
+_log_tables = None
+
+# Default shard count of parallel_probabilities, fixed so results do not
+# depend on the machine
+SHARDS = 64
+# Largest joint table (in entries) variable elimination may build
+MAX_FACTOR_ENTRIES = 3 ** 15
+# Effective sample size below which sampled_probabilities warns
+MIN_EFFECTIVE_SAMPLES = 100
+
+def probability_tables():
+    """
+    Probability tables for the current PROBS, rebuilt only when the
+    mutation rate, gene priors or trait probabilities change.
+    """
+    global _tables, _tables_key, _log_tables
+    # Flat so checking it stays cheap next to the per-person lookups it guards
+    traits = PROBS["trait"]
+    key = (
+        PROBS["mutation"], *PROBS["gene"].values(),
+        *traits[0].values(), *traits[1].values(), *traits[2].values(),
+    )
+    if key == _tables_key:
+        return _tables
+
+    mutation = PROBS["mutation"]
+    gene = tuple(PROBS["gene"][count] for count in range(3))
+    trait = tuple(
+        (PROBS["trait"][count][False], PROBS["trait"][count][True]) for count in range(3)
+    )
+    # Chance a parent with 0, 1 or 2 copies passes the gene on
+    passes = (mutation, 0.5, 1 - mutation)
+    inherit = tuple(
+        tuple(
+            ((1-m) * (1-f), m * (1-f) + (1-m) * f, m * f)
+            for f in passes
+        )
+        for m in passes
+    )
+    _tables, _tables_key = Tables(gene, inherit, trait), key
+    _log_tables = Tables(
+        tuple(map(_log, gene)),
+        tuple(tuple(tuple(map(_log, row)) for row in rows) for rows in inherit),
+        tuple(tuple(map(_log, row)) for row in trait),
+    )
+    return _tables
+
+def log_probability_tables():
+    """probability_tables() with every entry replaced by its natural log"""
+    probability_tables()
+    return _log_tables
+
+def _log(p):
+    return math.log(p) if p > 0 else -math.inf
+
+def logaddexp(a, b):
+    """log(exp(a) + exp(b)) without leaving log space"""
+    if a < b:
+        a, b = b, a
+    if b == -math.inf:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+def logsumexp(values):
+    """log(sum(exp(v) for v in values)), shifted by the largest value"""
+    values = list(values)
+    top = max(values)
+    if top == -math.inf:
+        return top
+    return top + math.log(sum(math.exp(v - top) for v in values))
+
+def joint_probability(people, one_gene, two_genes, have_trait, log=False):
+    """
+    Calculate joint probability of genetic inheritance and traits, or its
+    natural log when log=True (-inf for impossible assignments)
+    """
+    if log:
+        gene_table, inherit, trait_table = log_probability_tables()
+        prob = 0
+    else:
+        gene_table, inherit, trait_table = probability_tables()
+        prob = 1
     
     for person in people:
         # Determine gene count (0, 1, or 2)
-        if person in two_genes:
-            gene_count = 2
-        elif person in one_gene:
-            gene_count = 1
-        else:
-            gene_count = 0
+        gene_count = 2 if person in two_genes else 1 if person in one_gene else 0
         
         # Calculate gene probability
-        if not people[person]['mother']:  # No parents listed
-            gene_prob = PROBS["gene"][gene_count]
+        mother = people[person]['mother']
+        if not mother:  # No parents listed
+            gene_prob = gene_table[gene_count]
         else:
-            mother = people[person]['mother']
             father = people[person]['father']
-            
-            # Get parent probabilities
-            mother_prob = (
-                1 - PROBS["mutation"] if mother in two_genes else
-                PROBS["mutation"] if mother not in one_gene and mother not in two_genes else
-                0.5
-            )
-            
-            father_prob = (
-                1 - PROBS["mutation"] if father in two_genes else
-                PROBS["mutation"] if father not in one_gene and father not in two_genes else
-                0.5
-            )
-            
-            # Calculate inheritance probability
-            if gene_count == 2:
-                gene_prob = mother_prob * father_prob
-            elif gene_count == 1:
-                gene_prob = mother_prob * (1 - father_prob) + (1 - mother_prob) * father_prob
-            else:
-                gene_prob = (1 - mother_prob) * (1 - father_prob)
-        
-        # Calculate trait probability
-        trait = person in have_trait
-        trait_prob = PROBS["trait"][gene_count][trait]
+            gene_prob = inherit[
+                2 if mother in two_genes else 1 if mother in one_gene else 0
+            ][
+                2 if father in two_genes else 1 if father in one_gene else 0
+            ][gene_count]
         
-        # Multiply into joint probability
-        prob *= gene_prob * trait_prob
+        # Multiply gene and trait probabilities into joint probability
+        if log:
+            prob += gene_prob + trait_table[gene_count][person in have_trait]
+        else:
+            prob *= gene_prob * trait_table[gene_count][person in have_trait]
     
     return prob
 
-def update(probabilities, one_gene, two_genes, have_trait, p):
-    """Update probabilities with new joint probability"""
+def update(probabilities, one_gene, two_genes, have_trait, p, log=False):
+    """
+    Update probabilities with new joint probability. With log=True both
+    p and the accumulated values are natural logs (see empty_probabilities).
+    """
+    if log:
+        for person in probabilities:
+            gene = 2 if person in two_genes else 1 if person in one_gene else 0
+            genes = probabilities[person]["gene"]
+            genes[gene] = logaddexp(genes[gene], p)
+            traits = probabilities[person]["trait"]
+            trait = person in have_trait
+            traits[trait] = logaddexp(traits[trait], p)
+        return
+
     for person in probabilities:
         # Update gene probabilities
         if person in two_genes:
@@ -62,8 +146,19 @@ def update(probabilities, one_gene, two_genes, have_trait, p):
         # Update trait probabilities
         probabilities[person]["trait"][person in have_trait] += p
 
-def normalize(probabilities):
-    """Normalize probability distributions to sum to 1"""
+def normalize(probabilities, log=False):
+    """
+    Normalize probability distributions to sum to 1. With log=True the
+    accumulated log values are converted back to ordinary probabilities.
+    """
+    if log:
+        for person in probabilities:
+            for dist in probabilities[person].values():
+                total = logsumexp(dist.values())
+                for value in dist:
+                    dist[value] = math.exp(dist[value] - total)
+        return
+
     for person in probabilities:
         # Normalize gene probabilities
         total = sum(probabilities[person]["gene"].values())
@@ -73,4 +168,599 @@ def normalize(probabilities):
         # Normalize trait probabilities
         total = sum(probabilities[person]["trait"].values())
         for trait in probabilities[person]["trait"]:
-            probabilities[person]["trait"][trait] /= total
\ No newline at end of file
+            probabilities[person]["trait"][trait] /= total
+
+def inheritance_table():
+    """Child gene count distribution for each (mother, father) gene count pair"""
+    return np.array(probability_tables().inherit)
+
+def gene_factors(people):
+    """Factors (people, table) of the family's Bayesian network over gene counts"""
+    tables = probability_tables()
+    inherit = inheritance_table()
+    factors = []
+    for person in people:
+        # Observed traits weight the person's gene count
+        trait = people[person]["trait"]
+        evidence = np.array([
+            1 if trait is None else tables.trait[gene][trait] for gene in range(3)
+        ])
+        mother, father = people[person]["mother"], people[person]["father"]
+        if not mother:
+            factors.append(((person,), np.array(tables.gene) * evidence))
+            continue
+        factors.append(((mother, father, person), inherit * evidence))
+    return factors
+
+def _sum_product(factors, kept):
+    """Multiply factors and sum out every variable not in `kept`"""
+    variables = []
+    for names, _ in factors:
+        variables.extend(name for name in names if name not in variables)
+    if len(variables) > len(ascii_letters):
+        raise ValueError(
+            f"cannot multiply factors over {len(variables)} people at once, "
+            f"einsum supports at most {len(ascii_letters)}"
+        )
+    # The product spans every variable before any is summed out
+    if 3 ** len(variables) > MAX_FACTOR_ENTRIES:
+        raise ValueError(
+            f"multiplying factors over {len(variables)} people needs a table of "
+            f"3**{len(variables)} entries (a message of 3**{len(kept)}), above "
+            f"MAX_FACTOR_ENTRIES; use sampled_probabilities for this pedigree"
+        )
+    letters = dict(zip(variables, ascii_letters))
+    subscripts = ",".join("".join(letters[n] for n in names) for names, _ in factors)
+    subscripts += "->" + "".join(letters[n] for n in kept)
+    table = np.einsum(subscripts, *(table for _, table in factors))
+    # Rescale so long products do not underflow, the marginal is normalized anyway
+    return tuple(kept), table / table.max()
+
+def _multiply_out(factors, variable):
+    """Multiply factors mentioning `variable` and sum it out"""
+    variables = []
+    for names, _ in factors:
+        variables.extend(name for name in names if name not in variables)
+    return _sum_product(factors, [name for name in variables if name != variable])
+
+def elimination_order(factors):
+    """Greedy minimum-degree elimination order over the factors' variables"""
+    neighbors = {}
+    for names, _ in factors:
+        for name in names:
+            neighbors.setdefault(name, set()).update(n for n in names if n != name)
+
+    order = []
+    while neighbors:
+        variable = min(neighbors, key=lambda name: len(neighbors[name]))
+        # Eliminating a variable connects all of its neighbors
+        for name in neighbors[variable]:
+            neighbors[name] |= neighbors[variable] - {name}
+            neighbors[name].discard(variable)
+        del neighbors[variable]
+        order.append(variable)
+    return order
+
+def gene_marginal(factors, person, order=None):
+    """Posterior gene count distribution of `person` by bucket elimination"""
+    order = [name for name in order or elimination_order(factors) if name != person]
+    position = {name: i for i, name in enumerate(order)}
+    position[person] = len(order)
+
+    # Each factor waits in the bucket of its first variable to be eliminated
+    buckets = [[] for _ in range(len(order) + 1)]
+    for names, table in factors:
+        buckets[min(position[name] for name in names)].append((names, table))
+    for i, variable in enumerate(order):
+        if buckets[i]:
+            names, table = _multiply_out(buckets[i], variable)
+            if names:
+                buckets[min(position[name] for name in names)].append((names, table))
+
+    table = np.ones(3)
+    for _, factor in buckets[-1]:
+        table = table * factor
+    return table / table.sum()
+
+def gene_marginals(factors, order=None):
+    """
+    Posterior gene count distribution of everyone, from two passes over the
+    bucket tree: messages flow up the elimination order as in gene_marginal,
+    then back down, so each bucket ends up holding its variable's marginal.
+    """
+    order = order or elimination_order(factors)
+    position = {name: i for i, name in enumerate(order)}
+    buckets = [[] for _ in order]
+    for names, table in factors:
+        buckets[min(position[name] for name in names)].append((names, table))
+
+    # Upward pass: each bucket sends its variable summed out to its parent,
+    # the bucket of the first variable left in the message
+    children = [[] for _ in order]
+    up = [None] * len(order)
+    for i, variable in enumerate(order):
+        up[i] = _multiply_out(buckets[i] + [up[child] for child in children[i]], variable)
+        if up[i][0]:
+            children[min(position[name] for name in up[i][0])].append(i)
+
+    # Downward pass: each bucket sends its children everything but their own message
+    down = [None] * len(order)
+    marginals = {}
+    for i in reversed(range(len(order))):
+        incoming = buckets[i] + ([down[i]] if down[i] is not None else [])
+        for child in children[i]:
+            others = incoming + [up[c] for c in children[i] if c != child]
+            if not others:
+                continue
+            # A variable only this child's message mentions stays uniform
+            present = {name for names, _ in others for name in names}
+            down[child] = _sum_product(
+                others, [name for name in up[child][0] if name in present]
+            )
+        _, table = _sum_product(incoming + [up[c] for c in children[i]], (order[i],))
+        marginals[order[i]] = table / table.sum()
+    return marginals
+
+def variable_elimination(people):
+    """Gene and trait distributions for everyone, as `normalize` leaves them"""
+    tables = probability_tables()
+    marginals = gene_marginals(gene_factors(people))
+    probabilities = {}
+    for person in people:
+        genes = marginals[person]
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = sum(genes[gene] * tables.trait[gene][True] for gene in range(3))
+        else:
+            has_trait = float(trait)
+        probabilities[person] = {
+            "gene": {2: float(genes[2]), 1: float(genes[1]), 0: float(genes[0])},
+            "trait": {True: float(has_trait), False: 1 - float(has_trait)},
+        }
+    return probabilities
+
+def vectorized_probabilities(people, chunk_size=1 << 18):
+    """
+    Exact gene and trait distributions, scoring every (gene, trait)
+    assignment in log space with NumPy, `chunk_size` assignments at a time.
+    """
+    names = list(people)
+    ids = {name: i for i, name in enumerate(names)}
+    N = len(names)
+    tables = probability_tables()
+    with np.errstate(divide="ignore"):
+        log_prior = np.log(tables.gene)
+        log_inherit = np.log(tables.inherit)
+        log_trait = np.log(tables.trait)
+
+    founders = [ids[n] for n in names if not people[n]["mother"]]
+    children = [ids[n] for n in names if people[n]["mother"]]
+    mothers = [ids[people[names[i]]["mother"]] for i in children]
+    fathers = [ids[people[names[i]]["father"]] for i in children]
+    observed = [ids[n] for n in names if people[n]["trait"] is not None]
+    shown = [int(people[names[i]]["trait"]) for i in observed]
+    free = [ids[n] for n in names if people[n]["trait"] is None]
+
+    # Every trait combination of the people without evidence, as rows
+    combos = np.arange(2 ** len(free))
+    traits = (combos[:, None] >> np.arange(len(free))) & 1
+    digits = 3 ** np.arange(N)
+    step = max(1, chunk_size // len(combos))
+
+    gene_sums = np.zeros((N, 3))
+    trait_sums = np.zeros(len(free))
+    total = 0.0
+    offset = -np.inf  # log scale shared by the running sums
+    for start in range(0, 3 ** N, step):
+        genes = (np.arange(start, min(start + step, 3 ** N))[:, None] // digits) % 3
+
+        log_p = log_prior[genes[:, founders]].sum(axis=1)
+        log_p += log_inherit[
+            genes[:, mothers], genes[:, fathers], genes[:, children]
+        ].sum(axis=1)
+        log_p += log_trait[genes[:, observed], shown].sum(axis=1)
+        # One column per trait combination of the people without evidence
+        log_p = log_p[:, None] + log_trait[genes[:, free][:, None, :], traits].sum(axis=2)
+
+        peak = log_p.max()
+        if peak == -np.inf:
+            continue
+        if peak > offset:
+            scale = np.exp(offset - peak)
+            gene_sums *= scale
+            trait_sums *= scale
+            total *= scale
+            offset = peak
+        weights = np.exp(log_p - offset)
+
+        # Batched equivalent of `update` over every assignment in the chunk
+        by_genes = weights.sum(axis=1)
+        gene_sums += np.einsum("gni,g->ni", np.eye(3)[genes], by_genes)
+        trait_sums += (weights @ traits).sum(axis=0)
+        total += by_genes.sum()
+
+    gene_sums /= total
+    trait_sums /= total
+    probabilities = {}
+    for name in names:
+        i = ids[name]
+        trait = people[name]["trait"]
+        has_trait = trait_sums[free.index(i)] if trait is None else float(trait)
+        probabilities[name] = {
+            "gene": {gene: float(gene_sums[i, gene]) for gene in (2, 1, 0)},
+            "trait": {True: float(has_trait), False: 1 - float(has_trait)},
+        }
+    return probabilities
+
+def powerset(s):
+    """Return a list of all possible subsets of s, in a fixed order"""
+    s = list(s)
+    return [
+        set(subset) for subset in itertools.chain.from_iterable(
+            itertools.combinations(s, r) for r in range(len(s) + 1)
+        )
+    ]
+
+def empty_probabilities(people, log=False):
+    """Zeroed accumulators for update(); -inf (log of zero) when log=True"""
+    zero = -math.inf if log else 0
+    return {
+        person: {"gene": {2: zero, 1: zero, 0: zero}, "trait": {True: zero, False: zero}}
+        for person in people
+    }
+
+def _gene_sets(names):
+    """(one_gene, two_genes) for every base-3 number, digit k giving names[k]'s genes"""
+    sets = []
+    for index in range(3 ** len(names)):
+        one_gene, two_genes = set(), set()
+        for name in names:
+            index, gene = divmod(index, 3)
+            if gene == 1:
+                one_gene.add(name)
+            elif gene == 2:
+                two_genes.add(name)
+        sets.append((frozenset(one_gene), frozenset(two_genes)))
+    return sets
+
+def enumerate_shard(people, shard, shards):
+    """
+    Accumulate `update` over the `shard`-th of `shards` equal ranges of
+    assignments consistent with the known traits. Assignment k is decoded
+    directly: k // 3**N picks which people without a known trait have it,
+    and the base-3 digits of k % 3**N are everyone's gene counts.
+    """
+    probabilities = empty_probabilities(people)
+    names = list(people)
+    free = [name for name in names if people[name]["trait"] is None]
+    shown = {name for name in names if people[name]["trait"]}
+    # Gene digits are split in two halves, each decoded by table lookup
+    half = len(names) // 2
+    low_sets, high_sets = _gene_sets(names[:half]), _gene_sets(names[half:])
+    low_size, genes_total = 3 ** half, 3 ** len(names)
+    total = 2 ** len(free) * genes_total
+    start, stop = shard * total // shards, (shard + 1) * total // shards
+
+    last_traits = None
+    for index in range(start, stop):
+        traits, genes = divmod(index, genes_total)
+        if traits != last_traits:
+            have_trait = shown | {name for k, name in enumerate(free) if traits >> k & 1}
+            last_traits = traits
+        high, low = divmod(genes, low_size)
+        one_gene = low_sets[low][0] | high_sets[high][0]
+        two_genes = low_sets[low][1] | high_sets[high][1]
+        p = joint_probability(people, one_gene, two_genes, have_trait)
+        update(probabilities, one_gene, two_genes, have_trait, p)
+    return probabilities
+
+def merge(probabilities, partial):
+    """Add another shard's accumulated probabilities into `probabilities`"""
+    for person in probabilities:
+        for kind in ("gene", "trait"):
+            for value, p in partial[person][kind].items():
+                probabilities[person][kind][value] += p
+
+def parallel_probabilities(people, shards=SHARDS, workers=None):
+    """
+    Exact enumeration sharded across a process pool, with the shards
+    merged in order so a fixed shard count always gives the same result,
+    however many `workers` run them.
+    """
+    probabilities = empty_probabilities(people)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(
+            enumerate_shard, [people] * shards, range(shards), [shards] * shards
+        )
+        for partial in partials:
+            merge(probabilities, partial)
+    normalize(probabilities)
+    return probabilities
+
+def topological_order(people):
+    """People ordered so that parents always come before their children"""
+    order, placed = [], set()
+
+    def place(person):
+        if person in placed:
+            return
+        for parent in (people[person]["mother"], people[person]["father"]):
+            if parent:
+                place(parent)
+        placed.add(person)
+        order.append(person)
+
+    for person in people:
+        place(person)
+    return order
+
+def pruned_probabilities(people, log=False):
+    """
+    Exact enumeration that only builds assignments consistent with the
+    known traits, extending the joint probability one person at a time
+    down the family tree and dropping branches once it reaches zero.
+    log=True accumulates in log space so large pedigrees don't underflow.
+    """
+    if log:
+        gene_table, inherit, trait_table = log_probability_tables()
+        zero, one = -math.inf, 0
+    else:
+        gene_table, inherit, trait_table = probability_tables()
+        zero, one = 0, 1
+    order = topological_order(people)
+    probabilities = empty_probabilities(people, log)
+    genes = {}
+    one_gene, two_genes, have_trait = set(), set(), set()
+
+    def extend(i, prob):
+        if i == len(order):
+            update(probabilities, one_gene, two_genes, have_trait, prob, log)
+            return
+        person = order[i]
+        mother, father = people[person]["mother"], people[person]["father"]
+        trait = people[person]["trait"]
+        traits = (True, False) if trait is None else (trait,)
+
+        for gene_count in (0, 1, 2):
+            if not mother:
+                gene_prob = gene_table[gene_count]
+            else:
+                gene_prob = inherit[genes[mother]][genes[father]][gene_count]
+            if gene_prob == zero:
+                continue
+            genes[person] = gene_count
+            if gene_count:
+                (one_gene if gene_count == 1 else two_genes).add(person)
+
+            for has_trait in traits:
+                if log:
+                    p = prob + gene_prob + trait_table[gene_count][has_trait]
+                else:
+                    p = prob * gene_prob * trait_table[gene_count][has_trait]
+                if p == zero:
+                    continue
+                if has_trait:
+                    have_trait.add(person)
+                extend(i + 1, p)
+                have_trait.discard(person)
+
+            one_gene.discard(person)
+            two_genes.discard(person)
+
+    extend(0, one)
+    normalize(probabilities, log)
+    return probabilities
+
+def sampled_probabilities(
+    people, samples=100_000, batch_size=1 << 14, seed=None,
+    method="weighting", chains=512, burn_in=100,
+):
+    """
+    Approximate gene and trait distributions by sampling. Returns
+    (probabilities, errors, effective_samples): the first two are shaped
+    like normalize()'s output, with errors holding the standard error of
+    each estimate, and effective_samples is how many independent draws the
+    run was worth. Warns when that falls below MIN_EFFECTIVE_SAMPLES, as
+    the estimates and their errors are then unreliable.
+
+    method="weighting" draws gene counts down the family tree in batches of
+    `batch_size` and weights each sample by how well it explains the known
+    traits. With many known traits almost all the weight lands on a few
+    samples, so for heavily observed pedigrees use method="gibbs", which
+    runs `chains` Gibbs samplers side by side, drops the first `burn_in`
+    sweeps and takes `samples` draws in total after that.
+    """
+    rng = np.random.default_rng(seed)
+    order = topological_order(people)
+    ids = {name: i for i, name in enumerate(order)}
+    if method == "weighting":
+        mean, error, effective = _weighted_estimates(people, order, ids, samples, batch_size, rng)
+    elif method == "gibbs":
+        mean, error, effective = _gibbs_estimates(people, order, ids, samples, chains, burn_in, rng)
+    else:
+        raise ValueError(f"unknown sampling method {method!r}")
+    if effective < MIN_EFFECTIVE_SAMPLES:
+        warnings.warn(
+            f"only {effective:.1f} effective samples; the estimates and their "
+            f"standard errors are unreliable"
+            + (", try method='gibbs'" if method == "weighting" else ""),
+            RuntimeWarning,
+            stacklevel=2,
+        )
+
+    probabilities, errors = {}, {}
+    for name in people:
+        i = ids[name]
+        probabilities[name] = {
+            "gene": {gene: float(mean[i, gene]) for gene in (2, 1, 0)},
+            "trait": {True: float(mean[i, 3]), False: 1 - float(mean[i, 3])},
+        }
+        errors[name] = {
+            "gene": {gene: float(error[i, gene]) for gene in (2, 1, 0)},
+            "trait": {True: float(error[i, 3]), False: float(error[i, 3])},
+        }
+    return probabilities, errors, effective
+
+def _known_traits(people, order, ids):
+    observed = [ids[n] for n in order if people[n]["trait"] is not None]
+    shown = [int(people[order[i]]["trait"]) for i in observed]
+    return observed, shown
+
+def _weighted_estimates(people, order, ids, samples, batch_size, rng):
+    """
+    Likelihood-weighted means and standard errors of each person's one-hot
+    gene count and chance of showing the trait, as (N, 4) arrays in `order`,
+    plus the effective sample size w1^2 / w2
+    """
+    N = len(order)
+    tables = probability_tables()
+    gene_cdf = np.cumsum(tables.gene)[:2]
+    inherit_cdf = np.cumsum(tables.inherit, axis=2)[:, :, :2]
+    trait = np.array(tables.trait)
+    with np.errstate(divide="ignore"):
+        log_trait = np.log(trait)
+    observed, shown = _known_traits(people, order, ids)
+
+    # Running sums of w, w^2, w*x, w^2*x and w^2*x^2 for each estimate x
+    # (one-hot gene count, then chance of showing the trait)
+    w1 = w2 = 0.0
+    x1, x2, x3 = np.zeros((N, 4)), np.zeros((N, 4)), np.zeros((N, 4))
+    offset = -np.inf  # log scale shared by the running sums
+    for start in range(0, samples, batch_size):
+        size = min(batch_size, samples - start)
+        genes = np.empty((size, N), dtype=np.intp)
+        draws = rng.random((size, N, 1))
+        for name in order:
+            i = ids[name]
+            mother = people[name]["mother"]
+            if not mother:
+                cdf = gene_cdf
+            else:
+                cdf = inherit_cdf[genes[:, ids[mother]], genes[:, ids[people[name]["father"]]]]
+            genes[:, i] = (draws[:, i] > cdf).sum(axis=-1)
+
+        log_w = log_trait[genes[:, observed], shown].sum(axis=1)
+        peak = log_w.max()
+        if peak == -np.inf:
+            continue
+        if peak > offset:
+            scale = np.exp(offset - peak)
+            w1 *= scale
+            x1 *= scale
+            w2 *= scale * scale
+            x2 *= scale * scale
+            x3 *= scale * scale
+            offset = peak
+        weights = np.exp(log_w - offset)
+
+        squared = weights * weights
+        w1 += weights.sum()
+        w2 += squared.sum()
+        for gene in range(3):
+            x = (genes == gene).astype(float)
+            x1[:, gene] += weights @ x
+            x2[:, gene] += squared @ x
+        x3[:, :3] = x2[:, :3]  # indicators equal their squares
+        x = trait[genes, 1]
+        x[:, observed] = shown
+        x1[:, 3] += weights @ x
+        x2[:, 3] += squared @ x
+        x3[:, 3] += squared @ (x * x)
+
+    if not w1:
+        raise ValueError("no sample is consistent with the known traits")
+    mean = x1 / w1
+    # Delta-method variance of the self-normalized estimator
+    variance = (x3 - 2 * mean * x2 + mean * mean * w2) / (w1 * w1)
+    error = np.sqrt(np.maximum(variance, 0))
+    return mean, error, w1 * w1 / w2
+
+def _gibbs_estimates(people, order, ids, samples, chains, burn_in, rng):
+    """
+    Gibbs-sampled means and standard errors of the same estimates as
+    _weighted_estimates(). Each sweep redraws every person's gene count
+    from its distribution given their parents, children's genes (with the
+    other parent) and known trait, for all chains at once. The estimates
+    average those conditional distributions rather than the draws, errors
+    come from the spread between chains and the effective sample size is
+    the smallest variance ratio over the estimates that vary.
+    """
+    N = len(order)
+    tables = probability_tables()
+    trait = np.array(tables.trait)
+    with np.errstate(divide="ignore"):
+        log_gene = np.log(tables.gene)
+        log_inherit = np.log(tables.inherit)
+        log_trait = np.log(trait)
+    # Gene count first, so each lookup below gives one row per gene count:
+    # child's genes by (mother, father), then mother's or father's genes by
+    # (other parent, child)
+    as_child = log_inherit.transpose(2, 0, 1)
+    as_mother = log_inherit
+    as_father = log_inherit.transpose(1, 0, 2)
+
+    parents = [None] * N
+    # Per person: children they mothered and those children's fathers,
+    # then children they fathered and those children's mothers
+    children = [([], [], [], []) for _ in range(N)]
+    for name in order:
+        i = ids[name]
+        if people[name]["mother"]:
+            mother, father = ids[people[name]["mother"]], ids[people[name]["father"]]
+            parents[i] = (mother, father)
+            children[mother][0].append(i)
+            children[mother][1].append(father)
+            children[father][2].append(i)
+            children[father][3].append(mother)
+    evidence = [np.zeros(3) for _ in range(N)]
+    observed, shown = _known_traits(people, order, ids)
+    for i, has_trait in zip(observed, shown):
+        evidence[i] = log_trait[:, has_trait]
+
+    # Start every chain from a draw down the family tree. Genes are stored
+    # person-major so each update reads and writes contiguous rows
+    genes = np.empty((N, chains), dtype=np.intp)
+    gene_cdf = np.cumsum(tables.gene)[:2]
+    inherit_cdf = np.cumsum(tables.inherit, axis=2)[:, :, :2]
+    for i in range(N):
+        cdf = gene_cdf if parents[i] is None else inherit_cdf[genes[parents[i][0]], genes[parents[i][1]]]
+        genes[i] = (rng.random((chains, 1)) > cdf).sum(axis=-1)
+
+    sweeps = -(-samples // chains)
+    sums = np.zeros((N, 4, chains))
+    squares = np.zeros((N, 4))
+    for sweep in range(burn_in + sweeps):
+        draws = rng.random((N, chains))
+        conditionals = np.empty((N, 3, chains))
+        for i in range(N):
+            if parents[i] is None:
+                log_p = np.repeat((log_gene + evidence[i])[:, None], chains, axis=1)
+            else:
+                log_p = as_child[:, genes[parents[i][0]], genes[parents[i][1]]]
+                log_p += evidence[i][:, None]
+            mothered, fathers, fathered, mothers = children[i]
+            for others, kids, table in ((fathers, mothered, as_mother), (mothers, fathered, as_father)):
+                for other, kid in zip(others, kids):
+                    log_p += table[:, genes[other], genes[kid]]
+            log_p -= np.maximum(np.maximum(log_p[0], log_p[1]), log_p[2])
+            p = conditionals[i]
+            np.exp(log_p, out=p)
+            p /= p[0] + p[1] + p[2]
+            genes[i] = (draws[i] > p[0]).astype(np.intp) + (draws[i] > p[0] + p[1])
+        if sweep >= burn_in:
+            x = np.concatenate([conditionals, (trait[:, 1] @ conditionals)[:, None]], axis=1)
+            sums += x
+            squares += (x * x).sum(axis=2)
+    for i, has_trait in zip(observed, shown):
+        sums[i, 3] = has_trait * sweeps
+        squares[i, 3] = has_trait * sweeps * chains
+
+    if not np.isfinite(sums).all():
+        raise ValueError("the chains reached a state inconsistent with the known traits")
+    chain_means = sums / sweeps
+    mean = chain_means.mean(axis=2)
+    error = chain_means.std(axis=2, ddof=1) / math.sqrt(chains) if chains > 1 else np.zeros((N, 4))
+    spread = squares / (sweeps * chains) - mean * mean
+    varying = (spread > 1e-12) & (error > 0)
+    effective = float((spread[varying] / error[varying] ** 2).min()) if varying.any() else math.inf
+    return mean, error, effective
@@ -1,5 +1,110 @@
 import random
 from collections import defaultdict
+from operator import mul
+
+import numpy as np
+
+
+class QTable:
+    """
+    Q-values for every (state, action) pair of a game starting from `piles`,
+    stored in one dense NumPy array. A state is numbered by reading its pile
+    sizes as a mixed-radix number (pile i has radix piles[i] + 1) and action
+    (i, j) is column offsets[i] + j - 1, so lookups are plain array indexing.
+    Unvisited pairs hold 0, matching the dict-based table's default.
+    """
+
+    def __init__(self, piles=(1, 3, 5, 7)):
+        self.piles = tuple(piles)
+        strides, offsets = [], []
+        stride, offset = 1, 0
+        for count in self.piles:
+            strides.append(stride)
+            offsets.append(offset)
+            stride *= count + 1
+            offset += count
+        self.strides = tuple(strides)
+        self.offsets = tuple(offsets)
+        self.values = np.zeros((stride, offset))
+
+        # Pile and number of objects taken for every action column
+        self.action_piles = np.repeat(np.arange(len(self.piles)), self.piles)
+        self.action_counts = np.concatenate([np.arange(1, count + 1) for count in self.piles])
+        self.legal = [None] * stride  # legal action columns, filled in per state
+
+    def state_index(self, state):
+        return sum(map(mul, state, self.strides))
+
+    def action_index(self, action):
+        pile, count = action
+        return self.offsets[pile] + count - 1
+
+    def action(self, index):
+        return (int(self.action_piles[index]), int(self.action_counts[index]))
+
+    def available(self, state):
+        """Boolean mask of the action columns that are legal in `state`"""
+        return self.action_counts <= np.asarray(state)[self.action_piles]
+
+    def legal_actions(self, state):
+        """State index and array of legal action columns, cached per state"""
+        row = self.state_index(state)
+        columns = self.legal[row]
+        if columns is None:
+            columns = self.legal[row] = np.flatnonzero(self.available(state))
+        return row, columns
+
+    def get(self, state, action):
+        return self.values[self.state_index(state), self.action_index(action)]
+
+    def set(self, state, action, value):
+        self.values[self.state_index(state), self.action_index(action)] = value
+
+    def best(self, state):
+        """Highest Q-value over the legal actions in `state`, or 0 if there are none"""
+        row, columns = self.legal_actions(state)
+        if not len(columns):
+            return 0
+        return self.values[row, columns].max()
+
+    def save(self, filename):
+        """
+        Write the table as int64 pile sizes (preceded by their count)
+        followed by the raw little-endian float64 Q-values.
+        """
+        with open(filename, "wb") as f:
+            np.array([len(self.piles), *self.piles], dtype="<i8").tofile(f)
+            self.values.astype("<f8", copy=False).tofile(f)
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        """
+        Read a table written by save(). With mmap=True the Q-values are
+        memory-mapped read-only, so processes serving the same file share
+        its pages and start without reading it in; training such a table
+        raises an error.
+        """
+        count = int(np.fromfile(filename, dtype="<i8", count=1)[0])
+        piles = np.fromfile(filename, dtype="<i8", count=count + 1)[1:]
+        table = cls(piles.tolist())
+        offset = 8 * (count + 1)
+        if mmap:
+            table.values = np.memmap(
+                filename, dtype="<f8", mode="r", offset=offset, shape=table.values.shape
+            )
+        else:
+            table.values = np.fromfile(filename, dtype="<f8", offset=offset).reshape(table.values.shape)
+        return table
+
+
+def __init__(self, alpha=0.5, epsilon=0.1, piles=(1, 3, 5, 7)):
+    """
+    Initialize AI with an empty Q-learning table for games starting from
+    `piles`, a learning rate and an epsilon rate.
+    """
+    self.q = QTable(piles)
+    self.alpha = alpha
+    self.epsilon = epsilon
 
 
 def get_q_value(self, state, action):
@@ -7,9 +112,7 @@ def get_q_value(self, state, action):
     Return the Q-value for the state and action pair.
     If no Q-value exists yet, return 0.
     """
-    state_tuple = tuple(state)
-    action_tuple = tuple(action)
-    return self.q.get((state_tuple, action_tuple), 0)
+    return self.q.get(state, action)
 
 
 def update_q_value(self, state, action, old_q, reward, future_rewards):
@@ -18,10 +121,8 @@ def update_q_value(self, state, action, old_q, reward, future_rewards):
     using the Q-learning formula:
     Q(s, a) = old_q + alpha * (reward + future_rewards - old_q)
     """
-    state_tuple = tuple(state)
-    action_tuple = tuple(action)
     new_q = old_q + self.alpha * (reward + future_rewards - old_q)
-    self.q[(state_tuple, action_tuple)] = new_q
+    self.q.set(state, action, new_q)
 
 
 def best_future_reward(self, state):
@@ -30,51 +131,94 @@ def best_future_reward(self, state):
     That is, for all available actions in the state, return the maximum Q-value.
     If no Q-values exist yet, return 0.
     """
-    available_actions = Nim.available_actions(state)
-    if not available_actions:
-        return 0
-    
-    max_reward = -float('inf')
-    state_tuple = tuple(state)
-    
-    for action in available_actions:
-        action_tuple = tuple(action)
-        q_value = self.q.get((state_tuple, action_tuple), 0)
-        if q_value > max_reward:
-            max_reward = q_value
-    
-    return max_reward if max_reward != -float('inf') else 0
+    return self.q.best(state)
 
 
 def choose_action(self, state, epsilon=False):
     """
     Choose an action to take in the current state.
     If epsilon is True, use epsilon-greedy algorithm.
-    Otherwise, choose the best action available.
+    Otherwise, choose the best action available, breaking ties uniformly at random.
     """
-    available_actions = Nim.available_actions(state)
-    if not available_actions:
+    row, columns = self.q.legal_actions(state)
+    if not len(columns):
         return None
-    
-    state_tuple = tuple(state)
-    
+
     if epsilon and random.random() < self.epsilon:
         # Choose random action
-        return random.choice(list(available_actions))
-    else:
-        # Choose best action based on Q-values
-        best_action = None
-        best_q_value = -float('inf')
-        
-        for action in available_actions:
-            action_tuple = tuple(action)
-            q_value = self.q.get((state_tuple, action_tuple), 0)
-            if q_value > best_q_value:
-                best_q_value = q_value
-                best_action = action
-            elif q_value == best_q_value:
-                # If multiple actions have same Q-value, choose randomly among them
-                if random.choice([True, False]):
-                    best_action = action
-        
-        return best_action if best_action is not None else random.choice(list(available_actions))
\ No newline at end of file
+        return self.q.action(random.choice(columns))
+
+    # Choose best action based on Q-values
+    q_values = self.q.values[row, columns]
+    best = np.flatnonzero(q_values == q_values.max())
+    return self.q.action(columns[random.choice(best)])
+
+
+def self_play(self, n, batch_size=64, starts=None, seed=None):
+    """
+    Train by playing `n` games against itself, `batch_size` games at a time.
+    All games in a batch advance together: moves are chosen epsilon-greedily
+    with array operations and each step's Q-learning updates are applied to
+    the shared table in one batch, with a (state, action) pair that several
+    games share updated toward their mean target once per game. Values only
+    propagate back one move per batch step, so larger batches train faster
+    but need more games to learn as much. `starts` lists the pile configurations
+    to start games from (non-empty and no larger than the table's piles), cycled
+    through in order; the same seed always gives the same table.
+    """
+    rng = np.random.default_rng(seed)
+    q = self.q
+    starts = np.array(starts if starts is not None else [q.piles])
+    strides = np.array(q.strides)
+    width = q.values.shape[1]
+
+    def legal(piles):
+        return q.action_counts <= piles[:, q.action_piles]
+
+    for first in range(0, n, batch_size):
+        size = min(batch_size, n - first)
+        piles = starts[np.arange(first, first + size) % len(starts)].copy()
+        games = np.arange(size)
+        # Row and column of each player's last move, -1 before they have moved
+        last_rows = np.full((size, 2), -1)
+        last_cols = np.full((size, 2), -1)
+        player = 0
+
+        while len(games):
+            rows = piles @ strides
+            allowed = legal(piles)
+            q_values = np.where(allowed, q.values[rows], -np.inf)
+            explore = rng.random(len(games)) < self.epsilon
+            candidates = np.where(
+                explore[:, None], allowed, q_values == q_values.max(axis=1, keepdims=True)
+            )
+            # Uniform choice among the candidate columns of each game
+            cols = (rng.random(candidates.shape) * candidates).argmax(axis=1)
+
+            piles[np.arange(len(games)), q.action_piles[cols]] -= q.action_counts[cols]
+            done = ~piles.any(axis=1)
+            new_values = np.where(legal(piles), q.values[piles @ strides], -np.inf)
+            future = np.where(done, 0, new_values.max(axis=1))
+
+            # The player who just moved loses if the game is over, and the
+            # opponent's last move is rewarded with the resulting position
+            moved = last_rows[games, 1 - player] >= 0
+            update_rows = np.concatenate([rows[done], last_rows[games[moved], 1 - player]])
+            update_cols = np.concatenate([cols[done], last_cols[games[moved], 1 - player]])
+            rewards = np.concatenate([np.full(done.sum(), -1.0), done[moved].astype(float)])
+            futures = np.concatenate([np.zeros(done.sum()), future[moved]])
+            # Games in a batch often share a transition. A pair updated c times
+            # moves toward the mean of its targets as c sequential updates
+            # toward one target would, instead of keeping only the last write
+            touched, which, count = np.unique(
+                update_rows * width + update_cols, return_inverse=True, return_counts=True
+            )
+            pairs = divmod(touched, width)
+            targets = np.bincount(which, weights=rewards + futures) / count
+            old_q = q.values[pairs]
+            q.values[pairs] = old_q + (1 - (1 - self.alpha) ** count) * (targets - old_q)
+
+            last_rows[games, player] = rows
+            last_cols[games, player] = cols
+            player = 1 - player
+            piles, games = piles[~done], games[~done]
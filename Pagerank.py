@@ -1,9 +1,187 @@
+import itertools
+import math
+import os
 import random
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from itertools import islice
 
-def transition_model(corpus, current_page, d):
-    """Calculate probabilities for next page visit"""
+import numpy as np
+
+# Solvers accepted by iterate_pagerank
+SOLVERS = ("jacobi", "gauss-seidel", "aitken")
+# Sweeps between extrapolations, and between full sweeps when freezing
+AITKEN_PERIOD = 10
+FULL_SWEEP_PERIOD = 10
+# Share of the convergence threshold below which freezing skips a page
+FREEZE_FRACTION = 0.1
+
+# Inbound adjacency in CSR form: row i lists the pages linking to page i
+SparseCorpus = namedtuple(
+    "SparseCorpus", ["pages", "indptr", "indices", "out_degree", "dangling"]
+)
+
+class CompiledCorpus:
+    """Corpus with pages interned to integer IDs and an inbound-link index"""
+
+    def __init__(self, pages, out_indptr, out_indices, out_degree,
+                 in_indptr=None, in_indices=None):
+        self.pages = pages
+        self.out_indptr, self.out_indices = out_indptr, out_indices
+        self.out_degree = out_degree
+        if isinstance(out_degree, np.ndarray):
+            self.dangling = np.flatnonzero(out_degree == 0)
+        else:
+            self.dangling = [i for i, deg in enumerate(out_degree) if not deg]
+
+        # Array-backed corpora arrive with their inbound index already built
+        if in_indptr is not None:
+            self.in_indptr, self.in_indices = in_indptr, in_indices
+            return
+
+        # Counting sort of the outbound edges by target page
+        N = len(pages)
+        self.in_indptr = [0] * (N + 1)
+        for dst in out_indices:
+            self.in_indptr[dst + 1] += 1
+        for i in range(N):
+            self.in_indptr[i + 1] += self.in_indptr[i]
+        fill = self.in_indptr[:-1]
+        self.in_indices = [0] * len(out_indices)
+        for src in range(N):
+            for dst in self.outbound(src):
+                self.in_indices[fill[dst]] = src
+                fill[dst] += 1
+
+    @cached_property
+    def ids(self):
+        return {page: i for i, page in enumerate(self.pages)}
+
+    def __len__(self):
+        return len(self.pages)
+
+    def outbound(self, i):
+        """IDs of the pages page `i` links to"""
+        return self.out_indices[self.out_indptr[i]:self.out_indptr[i + 1]]
+
+    def inbound(self, i):
+        """IDs of the pages linking to page `i`"""
+        return self.in_indices[self.in_indptr[i]:self.in_indptr[i + 1]]
+
+    def add_page(self, page):
+        """Intern a page without links, returning its ID"""
+        if page in self.ids:
+            return self.ids[page]
+        if not isinstance(self.pages, list):
+            self.pages = list(self.pages)
+        self.pages.append(page)
+        self.ids[page] = i = len(self.pages) - 1
+        if isinstance(self.out_degree, np.ndarray):
+            self.out_indptr = np.append(self.out_indptr, self.out_indptr[-1])
+            self.in_indptr = np.append(self.in_indptr, self.in_indptr[-1])
+            self.out_degree = np.append(self.out_degree, 0)
+            self.dangling = np.append(self.dangling, i)
+        else:
+            self.out_indptr.append(self.out_indptr[-1])
+            self.in_indptr.append(self.in_indptr[-1])
+            self.out_degree.append(0)
+            self.dangling.append(i)
+        return i
+
+    def update_links(self, added=(), removed=()):
+        """
+        Apply link changes in place, adding any new pages, by patching only
+        the changed rows of both indexes. Returns the IDs of the pages whose
+        outbound links changed and of those whose inbound links changed.
+        """
+        for src, dst in added:
+            self.add_page(src)
+            self.add_page(dst)
+        out_rows, in_rows = {}, {}
+        for src, dst, add in itertools.chain(
+            ((src, dst, False) for src, dst in removed),
+            ((src, dst, True) for src, dst in added),
+        ):
+            if src not in self.ids or dst not in self.ids:
+                continue
+            i, j = self.ids[src], self.ids[dst]
+            if i not in out_rows:
+                out_rows[i] = [int(k) for k in self.outbound(i)]
+            if (j in out_rows[i]) == add:
+                continue
+            if j not in in_rows:
+                in_rows[j] = [int(k) for k in self.inbound(j)]
+            if add:
+                out_rows[i].append(j)
+                in_rows[j].append(i)
+                self.out_degree[i] += 1
+            else:
+                out_rows[i].remove(j)
+                in_rows[j].remove(i)
+                self.out_degree[i] -= 1
+
+        self.out_indptr, self.out_indices = _patch_csr(
+            self.out_indptr, self.out_indices, out_rows
+        )
+        self.in_indptr, self.in_indices = _patch_csr(
+            self.in_indptr, self.in_indices, in_rows
+        )
+        if isinstance(self.out_degree, np.ndarray):
+            self.dangling = np.flatnonzero(self.out_degree == 0)
+        elif out_rows:
+            dangling = set(self.dangling)
+            for i in out_rows:
+                if self.out_degree[i]:
+                    dangling.discard(i)
+                else:
+                    dangling.add(i)
+            self.dangling = sorted(dangling)
+        return set(out_rows), set(in_rows)
+
+def _patch_csr(indptr, indices, rows):
+    """CSR arrays with each row in `rows` replaced by its new list of indices"""
+    if not rows:
+        return indptr, indices
+    pieces, start = [], 0
+    change = [0] * len(indptr)
+    for row in sorted(rows):
+        pieces.append(indices[start:indptr[row]])
+        pieces.append(rows[row])
+        start = indptr[row + 1]
+        change[row + 1] = len(rows[row]) - (indptr[row + 1] - indptr[row])
+    pieces.append(indices[start:])
+
+    if isinstance(indices, np.ndarray):
+        indices = np.concatenate([np.asarray(p, dtype=indices.dtype) for p in pieces])
+        return indptr + np.cumsum(change), indices
+    indptr = [offset + shift for offset, shift in zip(indptr, itertools.accumulate(change))]
+    return indptr, list(itertools.chain.from_iterable(pieces))
+
+def compile_corpus(corpus):
+    """Intern corpus pages to integer IDs and index their links"""
+    if isinstance(corpus, CompiledCorpus):
+        return corpus
+    pages = list(corpus)
+    ids = {page: i for i, page in enumerate(pages)}
+
+    # Outbound CSR, ignoring links that leave the corpus
+    out_indptr, out_indices = [0], []
+    for page in pages:
+        out_indices.extend(ids[link] for link in corpus[page] if link in ids)
+        out_indptr.append(len(out_indices))
+
+    out_degree = [len(corpus[page]) for page in pages]
+    return CompiledCorpus(pages, out_indptr, out_indices, out_degree)
+
+def transition_model(corpus, current_page, d, teleport=None):
+    """Calculate probabilities for next page visit, jumping by `teleport` if given"""
     N = len(corpus)
-    prob = {page: (1-d)/N for page in corpus}  # Base probability for all pages
+    if teleport is None:
+        prob = {page: (1-d)/N for page in corpus}  # Base probability for all pages
+    else:
+        prob = {page: (1-d) * teleport.get(page, 0) for page in corpus}
     
     # Distribute link probabilities
     links = corpus[current_page]
@@ -16,39 +194,485 @@ def transition_model(corpus, current_page, d):
 
 def sample_pagerank(corpus, d, samples):
     """Estimate PageRank by simulating random surfer"""
-    counts = {page: 0 for page in corpus}
-    current = random.choice(list(corpus))
-    
+    corpus = compile_corpus(corpus)
+    N = len(corpus)
+    counts = [0] * N
+    current = random.randrange(N)
+
     for _ in range(samples):
         counts[current] += 1
-        current = random.choices(
-            *zip(*transition_model(corpus, current, d).items())
-        )[0]
-    
-    return {page: count/samples for page, count in counts.items()}
+        # Follow a link with probability d, otherwise (or with no links) jump
+        links = corpus.outbound(current)
+        if len(links) and random.random() < d:
+            current = random.choice(links)
+        else:
+            current = random.randrange(N)
+
+    return {page: count/samples for page, count in zip(corpus.pages, counts)}
 
-def iterate_pagerank(corpus, d, threshold=0.001):
-    """Calculate PageRank through iterative updates"""
+class PageRankStats:
+    """Iteration count, residual history and wall time of one solve"""
+
+    def __init__(self):
+        self.iterations = 0
+        self.residuals = []
+        self.wall_time = 0.0
+
+def _jacobi_sweep(corpus, d, ranks):
+    """Ranks after one full Jacobi sweep from `ranks`"""
     N = len(corpus)
-    ranks = {page: 1/N for page in corpus}
-    
+    dangling = sum(ranks[src] for src in corpus.dangling)
+    share = [ranks[src]/deg if deg else 0 for src, deg in enumerate(corpus.out_degree)]
+    return [
+        (1-d)/N + d * (dangling/N + sum(share[src] for src in corpus.inbound(page)))
+        for page in range(N)
+    ]
+
+def _extrapolate(x0, x1, x2, x3):
+    """
+    Quadratic extrapolation (Kamvar et al.) of four successive iterates,
+    or None when the iterates give no usable estimate.
+    """
+    y1 = [b - a for a, b in zip(x0, x1)]
+    y2 = [c - a for a, c in zip(x0, x2)]
+    y3 = [e - a for a, e in zip(x0, x3)]
+
+    # Least-squares fit of y3 against y1, y2 through the 2 x 2 normal equations
+    a11 = sum(u * u for u in y1)
+    a12 = sum(u * v for u, v in zip(y1, y2))
+    a22 = sum(v * v for v in y2)
+    b1 = -sum(u * w for u, w in zip(y1, y3))
+    b2 = -sum(v * w for v, w in zip(y2, y3))
+    det = a11 * a22 - a12 * a12
+    if not det or not math.isfinite(det):
+        return None
+    g1 = (b1 * a22 - b2 * a12) / det
+    g2 = (a11 * b2 - a12 * b1) / det
+
+    beta0, beta1, beta2 = g1 + g2 + 1, g2 + 1, 1
+    x = [beta0 * a + beta1 * b + beta2 * c for a, b, c in zip(x1, x2, x3)]
+    # Keep the total rank of the latest iterate
+    total = sum(x)
+    if not total or not math.isfinite(total):
+        return None
+    scale = sum(x3) / total
+    return [rank * scale for rank in x]
+
+def iterate_pagerank(corpus, d, threshold=0.001, ranks=None, solver="jacobi",
+                     freeze=False, stats=None, callback=None):
+    """
+    Calculate PageRank through iterative updates, optionally from given ranks.
+
+    `solver` is "jacobi", "gauss-seidel" (ranks updated in place) or "aitken"
+    (Jacobi with periodic quadratic extrapolation, kept only when it lowers
+    the residual). With `freeze`, a sweep only revisits pages linked from a
+    page that moved by at least FREEZE_FRACTION * `threshold` in the sweep
+    before, with a full sweep every FULL_SWEEP_PERIOD sweeps and to confirm
+    convergence. That only saves work when parts of the corpus settle well
+    before the rest; on well-mixed link graphs every page keeps moving. `stats` (a PageRankStats) and `callback(iteration, residual)`
+    report progress after each sweep.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver: {solver}")
+    start = time.perf_counter()
+    corpus = compile_corpus(corpus)
+    N = len(corpus)
+    if ranks is None:
+        ranks = [1/N] * N
+    else:
+        ranks = [ranks.get(page, 1/N) for page in corpus.pages]
+
+    in_place = solver == "gauss-seidel"
+    # Links leaving the corpus leak rank, otherwise ranks always sum to 1
+    conserves_rank = len(corpus.out_indices) == sum(corpus.out_degree)
+    # Pages that moved less than this are left frozen by the next sweep
+    tolerance = threshold * FREEZE_FRACTION if freeze else threshold
+    # Pages with no links are treated as linking to all pages
+    share = [ranks[src]/deg if deg else 0 for src, deg in enumerate(corpus.out_degree)]
+    active = range(N)
+    history = []
+    iteration = 0
+
     while True:
-        new_ranks = {}
+        full_sweep = len(active) == N
+        if full_sweep:
+            # Recount so the running total does not pick up rounding error
+            dangling = sum(ranks[src] for src in corpus.dangling)
+        start_dangling = dangling
+        updates = []
+        moving = []
         max_diff = 0
-        
-        for page in corpus:
+
+        for page in active:
             # Sum PR from pages linking here
-            incoming = sum(
-                ranks[src]/len(links) if links else ranks[src]/N
-                for src, links in corpus.items() 
-                if not links or page in links
-            )
+            incoming = dangling/N + sum(share[src] for src in corpus.inbound(page))
             new_rank = (1-d)/N + d * incoming
-            new_ranks[page] = new_rank
-            max_diff = max(max_diff, abs(new_rank - ranks[page]))
-        
+            diff = new_rank - ranks[page]
+            if in_place:
+                ranks[page] = new_rank
+                deg = corpus.out_degree[page]
+                if deg:
+                    share[page] = new_rank/deg
+                else:
+                    dangling += diff
+            else:
+                updates.append((page, new_rank, diff))
+            if abs(diff) >= tolerance:
+                moving.append(page)
+            max_diff = max(max_diff, abs(diff))
+
+        # Jacobi sweeps only apply their updates once every page has been read
+        for page, new_rank, diff in updates:
+            ranks[page] = new_rank
+            deg = corpus.out_degree[page]
+            if deg:
+                share[page] = new_rank/deg
+            else:
+                dangling += diff
+
+        if in_place and conserves_rank and full_sweep:
+            # In-place sweeps drift in total rank, which otherwise decays slowly
+            scale = 1 / sum(ranks)
+            ranks = [rank * scale for rank in ranks]
+            share = [rank * scale for rank in share]
+            dangling *= scale
+        iteration += 1
+        if stats is not None:
+            stats.residuals.append(max_diff)
+        if callback is not None:
+            callback(iteration, max_diff)
+        if not math.isfinite(max_diff):
+            raise ArithmeticError("PageRank iteration diverged")
+        if full_sweep and max_diff < threshold:
+            break
+
+        if solver == "aitken":
+            # Partial sweeps under `freeze` do not follow the extrapolation model
+            history = (history + [ranks[:]])[-4:] if full_sweep else []
+            if iteration % AITKEN_PERIOD == 0 and len(history) == 4:
+                candidate = _extrapolate(*history)
+                # Only keep an extrapolation that moves closer to the fixed point
+                if candidate is not None and all(map(math.isfinite, candidate)):
+                    swept = _jacobi_sweep(corpus, d, candidate)
+                    residual = max(abs(b - a) for a, b in zip(candidate, swept))
+                    if residual < max_diff:
+                        ranks = swept
+                        share = [
+                            ranks[src]/deg if deg else 0
+                            for src, deg in enumerate(corpus.out_degree)
+                        ]
+                history = []
+
+        # Only pages fed by a moving page can move, unless the dangling rank
+        # every page receives moved; everything is rechecked periodically
+        spread = d * abs(dangling - start_dangling) / N
+        if freeze and moving and spread < tolerance and iteration % FULL_SWEEP_PERIOD:
+            fed = set()
+            for page in moving:
+                fed.update(corpus.outbound(page))
+            active = list(fed) if len(fed) < N else range(N)
+        else:
+            active = range(N)
+
+    if stats is not None:
+        stats.iterations = iteration
+        stats.wall_time = time.perf_counter() - start
+    return dict(zip(corpus.pages, ranks))
+
+def compile_sparse(corpus):
+    """Compile corpus into inbound CSR arrays with a dangling-page mask"""
+    corpus = compile_corpus(corpus)
+    out_degree = np.asarray(corpus.out_degree, dtype=np.float64)
+    return SparseCorpus(
+        corpus.pages,
+        np.asarray(corpus.in_indptr, dtype=np.int64),
+        np.asarray(corpus.in_indices, dtype=np.int64),
+        out_degree,
+        out_degree == 0,
+    )
+
+def sparse_pagerank(corpus, d, threshold=0.001):
+    """Calculate PageRank through sparse matrix-vector power iteration"""
+    if not isinstance(corpus, SparseCorpus):
+        corpus = compile_sparse(corpus)
+    N = len(corpus.pages)
+    rows = np.repeat(np.arange(N), np.diff(corpus.indptr))
+    # Dangling pages keep degree 1 here, their rank is spread separately
+    degree = np.where(corpus.dangling, 1.0, corpus.out_degree)
+    ranks = np.full(N, 1/N)
+
+    while True:
+        share = np.where(corpus.dangling, 0.0, ranks / degree)
+        incoming = np.bincount(rows, weights=share[corpus.indices], minlength=N)
+        # Pages with no links are treated as linking to all pages
+        incoming += ranks[corpus.dangling].sum() / N
+        new_ranks = (1-d)/N + d * incoming
+
+        max_diff = np.abs(new_ranks - ranks).max()
         ranks = new_ranks
         if max_diff < threshold:
             break
-            
-    return ranks
\ No newline at end of file
+
+    return dict(zip(corpus.pages, ranks.tolist()))
+
+def _walk_counts(corpus, d, samples, walkers, rng):
+    """Visit counts of `samples` steps shared between a batch of random surfers"""
+    N = len(corpus)
+    indptr = np.asarray(corpus.out_indptr, dtype=np.int64)
+    # Pad so gathers stay in bounds for pages without links
+    indices = np.append(np.asarray(corpus.out_indices, dtype=np.int64), 0)
+    num_links = np.diff(indptr)
+
+    counts = np.zeros(N, dtype=np.int64)
+    walkers = max(1, min(walkers, samples))
+    current = rng.integers(N, size=walkers)
+    buffer = []
+    taken = 0
+
+    while taken < samples:
+        # The last step only counts as many walkers as the budget allows
+        visits = current[:samples - taken]
+        buffer.append(visits)
+        taken += len(visits)
+        if len(buffer) == 64 or taken == samples:
+            counts += np.bincount(np.concatenate(buffer), minlength=N)
+            buffer = []
+
+        # Follow a link with probability d, otherwise (or with no links) jump
+        links = num_links[current]
+        follow = (links > 0) & (rng.random(walkers) < d)
+        offset = (rng.random(walkers) * links).astype(np.int64)
+        current = np.where(
+            follow,
+            indices[indptr[current] + offset],
+            rng.integers(N, size=walkers),
+        )
+
+    return counts
+
+def batch_sample_pagerank(corpus, d, samples, walkers=4096, seed=None):
+    """Estimate PageRank with many random surfers stepped together in NumPy"""
+    corpus = compile_corpus(corpus)
+    counts = _walk_counts(corpus, d, samples, walkers, np.random.default_rng(seed))
+    return dict(zip(corpus.pages, (counts / samples).tolist()))
+
+def _sample_shard(corpus, d, samples, walkers, seed):
+    """Visit counts for one worker's share of the sampling budget"""
+    return _walk_counts(corpus, d, samples, walkers, np.random.default_rng(seed))
+
+def parallel_sample_pagerank(corpus, d, samples, workers=None, walkers=4096, seed=None):
+    """Estimate PageRank by merging visit counts sampled across a process pool"""
+    corpus = compile_corpus(corpus)
+    workers = workers or os.cpu_count() or 1
+
+    # Split the budget evenly, each worker with its own RNG stream
+    base, extra = divmod(samples, workers)
+    shares = [base + (i < extra) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partial = pool.map(
+            _sample_shard,
+            [corpus] * workers, [d] * workers, shares, [walkers] * workers, seeds,
+        )
+        counts = sum(partial, np.zeros(len(corpus), dtype=np.int64))
+
+    return dict(zip(corpus.pages, (counts / samples).tolist()))
+
+def update_pagerank(corpus, d, ranks, added=(), removed=(), threshold=0.001, local=False):
+    """
+    Apply link changes to corpus in place and update its previous ranks.
+
+    With `local`, only pages the changes reach are re-evaluated. Pass a
+    CompiledCorpus there: its indexes are patched row by row, so the work
+    follows the affected pages, while a dict corpus is recompiled first.
+    """
+    if isinstance(corpus, CompiledCorpus):
+        N = len(corpus)
+        dangling_rank = sum(ranks.get(corpus.pages[i], 0) for i in corpus.dangling)
+        changed, targets = corpus.update_links(added, removed)
+    else:
+        N = len(corpus)
+        dangling_rank = sum(ranks.get(page, 0) for page in corpus if not corpus[page])
+        for src, dst in removed:
+            corpus[src].discard(dst)
+        for src, dst in added:
+            corpus.setdefault(src, set()).add(dst)
+            corpus.setdefault(dst, set())
+
+    # New pages change the teleport term everywhere, so start a full sweep
+    if not local or len(corpus) != N:
+        return iterate_pagerank(corpus, d, threshold, ranks)
+
+    if not isinstance(corpus, CompiledCorpus):
+        corpus = compile_corpus(corpus)
+        changed = {corpus.ids[src] for src, _ in itertools.chain(added, removed)}
+        targets = {corpus.ids[dst] for _, dst in itertools.chain(added, removed)}
+    x = [ranks[page] for page in corpus.pages]
+    degree = corpus.out_degree
+
+    # Dangling pages spread their rank evenly, so their total only scales
+    # the solution of x = s/N + d*A*x. Propagate with the old total held
+    # fixed, then correct the scale once at the end.
+    scale = 1 - d + d * dangling_rank
+    queue = deque(targets)
+    queue.extend(dst for src in changed for dst in corpus.outbound(src))
+    queued = set(queue)
+
+    while queue:
+        page = queue.popleft()
+        queued.discard(page)
+        incoming = sum(x[src] / degree[src] for src in corpus.inbound(page) if degree[src])
+        new_rank = scale / N + d * incoming
+        diff = new_rank - x[page]
+        x[page] = new_rank
+        if abs(diff) >= threshold:
+            for dst in corpus.outbound(page):
+                if dst not in queued:
+                    queue.append(dst)
+                    queued.add(dst)
+
+    # The scale s must equal 1 - d + d * (dangling rank after the update)
+    dangling_rank = sum(x[i] for i in corpus.dangling)
+    factor = (1 - d) / (scale - d * dangling_rank)
+    return {page: rank * factor for page, rank in zip(corpus.pages, x)}
+
+def _fill_csr(chunks, rows, cols, N):
+    """Counting-sort streamed edge chunks into CSR arrays keyed by column `rows`"""
+    counts = np.zeros(N, dtype=np.int64)
+    for chunk in chunks():
+        counts += np.bincount(chunk[:, rows], minlength=N)
+    indptr = np.zeros(N + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    fill = indptr[:-1].copy()
+    for chunk in chunks():
+        order = np.argsort(chunk[:, rows], kind="stable")
+        row = chunk[order, rows]
+        # Position of each edge within its row's block of this chunk
+        rank = np.arange(len(row)) - np.searchsorted(row, row)
+        indices[fill[row] + rank] = chunk[order, cols]
+        fill += np.bincount(row, minlength=N)
+
+    return indptr, indices
+
+def _read_text_edges(filename, chunk_size):
+    """Intern `source target` lines into compact ID arrays, chunk by chunk"""
+    ids = {}
+    chunks = []
+    with open(filename) as file:
+        while True:
+            lines = list(islice(file, chunk_size))
+            if not lines:
+                break
+            edges = []
+            for line in lines:
+                names = line.split()
+                if not names or names[0].startswith("#"):
+                    continue
+                # A lone name declares a page without links
+                for name in names[:2]:
+                    ids.setdefault(name, len(ids))
+                if len(names) > 1:
+                    edges.append((ids[names[0]], ids[names[1]]))
+            chunks.append(np.array(edges, dtype=np.int32).reshape(-1, 2))
+    return list(ids), chunks
+
+def load_edges(filename, binary=False, mmap=False, num_pages=None, chunk_size=1 << 20):
+    """Stream an edge-list file into an array-backed CompiledCorpus"""
+    if binary:
+        # Little-endian int32 (source, target) pairs, pages named by ID
+        if mmap:
+            edges = np.memmap(filename, dtype="<i4", mode="r")
+        else:
+            edges = np.fromfile(filename, dtype="<i4")
+        edges = edges.reshape(-1, 2)
+        chunks = lambda: (
+            edges[i:i + chunk_size] for i in range(0, len(edges), chunk_size)
+        )
+        N = max((int(chunk.max()) + 1 for chunk in chunks() if len(chunk)), default=0)
+        pages = range(max(N, num_pages or 0))
+    else:
+        pages, text_chunks = _read_text_edges(filename, chunk_size)
+        chunks = lambda: iter(text_chunks)
+
+    N = len(pages)
+    out_indptr, out_indices = _fill_csr(chunks, 0, 1, N)
+    in_indptr, in_indices = _fill_csr(chunks, 1, 0, N)
+    return CompiledCorpus(
+        pages, out_indptr, out_indices, np.diff(out_indptr), in_indptr, in_indices
+    )
+
+def save_edges(corpus, filename):
+    """Write corpus links as a binary edge list, returning the page order"""
+    corpus = compile_corpus(corpus)
+    sources = np.repeat(np.arange(len(corpus)), np.diff(corpus.out_indptr))
+    edges = np.column_stack([sources, np.asarray(corpus.out_indices, dtype=np.int64)])
+    edges.astype("<i4").tofile(filename)
+    return corpus.pages
+
+def teleport_matrix(corpus, seeds):
+    """Teleport distributions, one column per seed set or {page: weight} dict"""
+    corpus = compile_corpus(corpus)
+    matrix = np.zeros((len(corpus), len(seeds)))
+    for column, seed in enumerate(seeds):
+        weights = seed if isinstance(seed, dict) else dict.fromkeys(seed, 1)
+        for page, weight in weights.items():
+            matrix[corpus.ids[page], column] = weight
+        total = matrix[:, column].sum()
+        if not total > 0 or (matrix[:, column] < 0).any():
+            raise ValueError(f"Teleport column {column} needs non-negative weights with a positive sum")
+        matrix[:, column] /= total
+    return matrix
+
+def personalized_pagerank(corpus, d, teleport, threshold=0.001, block=1):
+    """
+    Calculate personalized PageRank for every column of the N x K `teleport`
+    matrix at once, returning an N x K rank matrix with rows in page order.
+
+    Columns are solved `block` at a time as one sparse matrix-matrix
+    iteration, and converged columns drop out of the block. NumPy gathers
+    every edge once per column either way, so wider blocks only pay off
+    when columns converge together; one column at a time measures fastest.
+    """
+    if not isinstance(corpus, SparseCorpus):
+        corpus = compile_sparse(corpus)
+    N = len(corpus.pages)
+    teleport = np.asarray(teleport, dtype=np.float64)
+    if not np.isfinite(teleport).all() or (teleport < 0).any():
+        raise ValueError("Teleport weights must be finite and non-negative")
+    if not (teleport.sum(axis=0) > 0).all():
+        raise ValueError("Every teleport column needs a positive sum")
+    degree = np.where(corpus.dangling, 1.0, corpus.out_degree)[:, None]
+    rows = np.repeat(np.arange(N), np.diff(corpus.indptr))
+    ranks = np.empty_like(teleport)
+    # Flat (page, column) bins of each edge, by block width
+    bins = {}
+
+    for first in range(0, teleport.shape[1], block):
+        columns = np.arange(first, min(first + block, teleport.shape[1]))
+        jump = (1-d) * teleport[:, columns]
+        block_ranks = np.full((N, len(columns)), 1/N)
+
+        while len(columns):
+            K = len(columns)
+            if K not in bins:
+                bins[K] = (rows[:, None] * K + np.arange(K)).ravel()
+            share = np.where(corpus.dangling[:, None], 0.0, block_ranks / degree)
+            incoming = np.bincount(
+                bins[K], weights=share[corpus.indices].ravel(), minlength=N * K
+            ).reshape(N, K)
+            # Pages with no links are treated as linking to all pages
+            incoming += block_ranks[corpus.dangling].sum(axis=0) / N
+            new_ranks = jump + d * incoming
+
+            residuals = np.abs(new_ranks - block_ranks).max(axis=0)
+            if not np.isfinite(residuals).all():
+                raise ArithmeticError("PageRank iteration diverged")
+            converged = residuals < threshold
+            ranks[:, columns[converged]] = new_ranks[:, converged]
+            columns, jump = columns[~converged], jump[:, ~converged]
+            block_ranks = new_ranks[:, ~converged]
+
+    return ranks
@@ -1,5 +1,7 @@
 import random
 
+from Pagerank import compile_corpus
+
 def transition_model(corpus, current_page, damping_factor):
     """
     Returns probability distribution of next page visit.
@@ -23,42 +25,54 @@ def transition_model(corpus, current_page, damping_factor):
 
 def sample_pagerank(corpus, damping_factor, n):
     """Estimates PageRank by simulating random surfer for n samples."""
-    counts = {page: 0 for page in corpus}
-    current = random.choice(list(corpus))  # Start at random page
+    corpus = compile_corpus(corpus)
+    N = len(corpus)
+    counts = [0] * N
+    current = random.randrange(N)  # Start at random page
     
     for _ in range(n):
         counts[current] += 1
-        model = transition_model(corpus, current, damping_factor)
-        current = random.choices(list(model.keys()), weights=model.values())[0]
+        # Follow a random link, or jump anywhere (always when there are no links)
+        links = corpus.outbound(current)
+        if len(links) and random.random() < damping_factor:
+            current = random.choice(links)
+        else:
+            current = random.randrange(N)
     
     # Normalize counts to probabilities
-    return {page: count/n for page, count in counts.items()}
+    return {page: count/n for page, count in zip(corpus.pages, counts)}
 
 def iterate_pagerank(corpus, damping_factor, threshold=0.001):
     """Calculates PageRank iteratively until convergence."""
+    corpus = compile_corpus(corpus)
     N = len(corpus)
-    ranks = {page: 1/N for page in corpus}  # Initialize equal ranks
+    ranks = [1/N] * N  # Initialize equal ranks
     
     while True:
-        new_ranks = {}
+        new_ranks = []
         max_diff = 0
         
-        for page in corpus:
+        # Handle pages with no links (treat as linking to all)
+        dangling_sum = sum(ranks[page] for page in corpus.dangling) / N
+        # Share of PageRank each page passes along each of its links
+        shares = [
+            ranks[page] / degree if degree else 0
+            for page, degree in enumerate(corpus.out_degree)
+        ]
+        
+        for page in range(N):
             # Sum PageRank from all pages that link to this page
-            rank_sum = 0
-            for linking_page in corpus:
-                # Handle pages with no links (treat as linking to all)
-                links = corpus[linking_page] if corpus[linking_page] else corpus.keys()
-                if page in links:
-                    rank_sum += ranks[linking_page] / len(links)
+            rank_sum = dangling_sum
+            for linking_page in corpus.inbound(page):
+                rank_sum += shares[linking_page]
             
             # Calculate new rank
             new_rank = (1 - damping_factor)/N + damping_factor * rank_sum
-            new_ranks[page] = new_rank
+            new_ranks.append(new_rank)
             max_diff = max(max_diff, abs(new_rank - ranks[page]))
         
         ranks = new_ranks
         if max_diff < threshold:  # Stop when converged
             break
             
-    return ranks
\ No newline at end of file
+    return dict(zip(corpus.pages, ranks))
@@ -1,67 +1,664 @@
+import argparse
 import random
+import statistics
+import time
+from array import array
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+# Frontier components up to this many cells are enumerated configuration by
+# configuration, larger ones are counted by dynamic programming
+MAX_COMPONENT = 30
+
+class Minesweeper:
+    """Headless game board with `mines` mines placed from `seed`"""
+
+    def __init__(self, h=8, w=8, mines=8, seed=None):
+        self.h, self.w = h, w
+        cells = [(i, j) for i in range(h) for j in range(w)]
+        self.mines = set(random.Random(seed).sample(cells, mines))
+
+    def is_mine(self, cell):
+        return cell in self.mines
+
+    def nearby_mines(self, cell):
+        i, j = cell
+        return sum((x,y) in self.mines for x in (i-1,i,i+1) for y in (j-1,j,j+1)
+                   if (x,y) != cell)
 
 class Sentence:
-    def __init__(self, cells, count):
-        self.cells, self.count = set(cells), count
+    """Cells as a bitmask (bit i*w + j for cell (i, j)) holding `count` mines"""
+    __slots__ = ("mask", "count")
+
+    def __init__(self, mask, count):
+        self.mask, self.count = mask, count
+
+    def __eq__(self, other):
+        if not isinstance(other, Sentence):
+            return NotImplemented
+        return self.mask == other.mask and self.count == other.count
+
+    def __hash__(self):
+        return hash((self.mask, self.count))
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def update(self, bit, is_mine):
+        """Sentence without the cell at `bit`, which is a mine or safe"""
+        if not self.mask & bit:
+            return self
+        return Sentence(self.mask & ~bit, self.count - is_mine)
+
+    def issubset(self, other):
+        return self.mask & other.mask == self.mask
+
+def configurations(n, constraints):
+    """
+    Yield 0/1 mine assignments to cells 0..n-1 satisfying every
+    (cell indices, count) constraint.
+    """
+    touching = [[] for _ in range(n)]
+    for c, (indices, _) in enumerate(constraints):
+        for i in indices:
+            touching[i].append(c)
+    need = [count for _, count in constraints]  # mines still to place
+    left = [len(indices) for indices, _ in constraints]  # cells still open
+    assignment = [0] * n
+
+    def place(i):
+        if i == n:
+            yield assignment
+            return
+        for value in (0, 1):
+            for c in touching[i]:
+                need[c] -= value
+                left[c] -= 1
+            if all(0 <= need[c] <= left[c] for c in touching[i]):
+                assignment[i] = value
+                yield from place(i + 1)
+            for c in touching[i]:
+                need[c] += value
+                left[c] += 1
+
+    yield from place(0)
+
+def count_configurations(n, constraints):
+    """
+    Count the assignments `configurations` would yield without listing them:
+    the number of configurations by mine total, and per mine total the
+    number with each cell mined.
+
+    Cells are taken in order, with the state after cell i being the mines
+    still needed by the constraints it leaves open, so the work grows with
+    the number of open constraints rather than of configurations.
+    """
+    touching = [[] for _ in range(n)]
+    for c, (indices, _) in enumerate(constraints):
+        for i in indices:
+            touching[i].append(c)
+    # Cells still open in each constraint touching cell i once it is placed
+    remaining = [len(indices) for indices, _ in constraints]
+    left = []
+    for i in range(n):
+        for c in touching[i]:
+            remaining[c] -= 1
+        left.append({c: remaining[c] for c in touching[i]})
+
+    # Forward pass: configurations of cells < i by mine total, per state,
+    # where a state maps each open constraint to the mines it still needs
+    need = {c: count for c, (_, count) in enumerate(constraints)}
+    forward = [{(): [1]}]
+    edges = []  # per cell, (state, value, next state) transitions
+    open_ = []
+    for i in range(n):
+        started = [c for c in touching[i] if c not in open_]
+        closing = {c for c in touching[i] if not left[i][c]}
+        next_open = [c for c in open_ + started if c not in closing]
+        layer, moves = {}, []
+        for state, ways in forward[i].items():
+            current = dict(zip(open_, state))
+            for c in started:
+                current[c] = need[c]
+            for value in (0, 1):
+                after = {c: current[c] - value for c in touching[i]}
+                if not all(0 <= after[c] <= left[i][c] for c in touching[i]):
+                    continue
+                following = tuple(after.get(c, current.get(c)) for c in next_open)
+                shifted = [0] * value + ways
+                if following in layer:
+                    layer[following] = _add(layer[following], shifted)
+                else:
+                    layer[following] = shifted
+                moves.append((state, value, following))
+        forward.append(layer)
+        edges.append(moves)
+        open_ = next_open
+
+    # Backward pass: completions of cells >= i by mine total, per state
+    backward = [None] * n + [{(): [1]}]
+    for i in reversed(range(n)):
+        layer = {}
+        for state, value, following in edges[i]:
+            # Some states cannot be completed by the cells that follow
+            if following not in backward[i + 1]:
+                continue
+            shifted = [0] * value + backward[i + 1][following]
+            layer[state] = _add(layer[state], shifted) if state in layer else shifted
+        backward[i] = layer
 
-    def update(self, cell, is_mine):
-        if cell in self.cells:
-            self.cells.remove(cell)
-            if is_mine: self.count -= 1
+    totals = forward[n].get((), [0])
+    totals = totals + [0] * (n + 1 - len(totals))
+    per_cell = [[0] * n for _ in range(n + 1)]
+    for i in range(n):
+        for state, value, following in edges[i]:
+            if not value or following not in backward[i + 1]:
+                continue
+            both = convolve(forward[i][state], backward[i + 1][following])
+            for k, ways in enumerate(both, 1):
+                per_cell[k][i] += ways
+    return totals, per_cell
+
+def _add(a, b):
+    """Sum of two configuration counts by mine total"""
+    if len(a) < len(b):
+        a, b = b, a
+    return [x + y for x, y in zip(a, b)] + a[len(b):]
+
+def convolve(a, b):
+    """Distribution of the mine total of two independent parts"""
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+def column_masks(w):
+    """Neighbors of a cell in column j, in rows 0-2 before shifting to its row"""
+    masks = []
+    for j in range(w):
+        row = sum(1 << y for y in (j-1, j, j+1) if 0 <= y < w)
+        masks.append((row | row << w | row << 2*w) & ~(1 << (w + j)))
+    return masks
+
+class Knowledge:
+    """
+    Sentences about one h x w board, indexed by the cells they hold, with
+    inference driven by a worklist of sentences changed since it last ran.
+    """
 
-class MinesweeperAI:
     def __init__(self, h=8, w=8):
         self.h, self.w = h, w
-        self.moves = set()
-        self.mines = set()
-        self.safe = set()
-        self.knowledge = []
+        # Bitboards, bit i*w + j for cell (i, j)
+        self.mines_mask = 0
+        self.safe_mask = 0
+        self.knowledge = set()
+        self.index = defaultdict(set)  # cell -> sentences holding it
+        self.pending = deque()  # sentences changed since last inference
 
-    def add_knowledge(self, cell, count):
-        self.moves.add(cell)
-        self.safe.add(cell)
-        
-        # Get unknown neighbors
+        self.board_mask = (1 << (h * w)) - 1
+        self.column_masks = column_masks(w)
+
+    def load(self, safe_mask, mines_mask, sentences):
+        """Replace the knowledge with already inferred masks and sentences"""
+        self.safe_mask, self.mines_mask = safe_mask, mines_mask
+        self.knowledge = set(sentences)
+        self.index.clear()
+        self.pending.clear()
+        for s in self.knowledge:
+            for cell in self.cells(s.mask):
+                self.index[cell].add(s)
+
+    def bit(self, cell):
+        return 1 << (cell[0] * self.w + cell[1])
+
+    def cells(self, mask):
+        """Cells whose bits are set in `mask`"""
+        if mask.bit_count() > 64:
+            # One pass over the binary digits beats peeling off many bits
+            bits = bin(mask)[:1:-1]
+            yield from (divmod(k, self.w) for k, b in enumerate(bits) if b == "1")
+            return
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            yield divmod(low.bit_length() - 1, self.w)
+
+    def neighbor_mask(self, cell):
         i, j = cell
-        neighbors = {(x,y) for x in (i-1,i,i+1) for y in (j-1,j,j+1) 
-                    if (x,y) != cell and 0<=x<self.h and 0<=y<self.w 
-                    and (x,y) not in self.moves and (x,y) not in self.mines}
-        
-        # Add new knowledge and update
-        self.knowledge.append(Sentence(neighbors, count))
-        changed = True
-        while changed:
-            changed = False
+        mask = self.column_masks[j]
+        mask = mask << (i-1) * self.w if i else mask >> self.w
+        return mask & self.board_mask
+
+    def add_clue(self, cell, count):
+        """Record that safe `cell` has `count` neighboring mines and infer"""
+        if not self.safe_mask & self.bit(cell):
+            self.resolve(cell, False)
+
+        # Get unknown neighbors, counting known mines off the total
+        neighbors = self.neighbor_mask(cell)
+        count -= (neighbors & self.mines_mask).bit_count()
+        self.add_sentence(neighbors & ~(self.safe_mask | self.mines_mask), count)
+        self.infer()
+
+    def add_sentence(self, mask, count):
+        """Index a new sentence and queue it, unless it adds nothing"""
+        s = Sentence(mask, count)
+        if not mask or s in self.knowledge:
+            return
+        self.knowledge.add(s)
+        for cell in self.cells(mask):
+            self.index[cell].add(s)
+        self.pending.append(s)
+
+    def remove_sentence(self, s):
+        self.knowledge.discard(s)
+        for cell in self.cells(s.mask):
+            if cell in self.index:
+                self.index[cell].discard(s)
+
+    def resolve(self, cell, is_mine):
+        """Record a safe or mine cell and rewrite the sentences it touches"""
+        bit = self.bit(cell)
+        if is_mine:
+            self.mines_mask |= bit
+        else:
+            self.safe_mask |= bit
+        for s in self.index.pop(cell, ()):
+            self.remove_sentence(s)
+            updated = s.update(bit, is_mine)
+            self.add_sentence(updated.mask, updated.count)
+
+    def infer(self):
+        """Run inference over queued sentences until nothing changes"""
+        while self.pending:
+            s = self.pending.popleft()
+            if s not in self.knowledge:
+                continue
+            
             # Check for new safes/mines
-            for s in self.knowledge:
-                for cell in s.cells.copy():
-                    if s.count == 0:
-                        self.safe.add(cell)
-                        changed = True
-                    if len(s.cells) == s.count:
-                        self.mines.add(cell)
-                        changed = True
-            # Update all sentences
-            for s in self.knowledge[:]:
-                for cell in self.safe: s.update(cell, False)
-                for cell in self.mines: s.update(cell, True)
-                if not s.cells: self.knowledge.remove(s)
-            # Check subsets
-            new_knowledge = []
-            for s1 in self.knowledge:
-                for s2 in self.knowledge:
-                    if s1.cells < s2.cells:
-                        new = Sentence(s2.cells-s1.cells, s2.count-s1.count)
-                        if new not in self.knowledge+new_knowledge:
-                            new_knowledge.append(new)
-            if new_knowledge:
-                self.knowledge += new_knowledge
-                changed = True
+            if s.count == 0 or s.count == len(s):
+                self.remove_sentence(s)
+                unknown = s.mask & ~(self.safe_mask | self.mines_mask)
+                for cell in self.cells(unknown):
+                    self.resolve(cell, s.count > 0)
+                continue
+            
+            # Check subsets, only against sentences sharing a cell
+            related = set().union(*(self.index[cell] for cell in self.cells(s.mask)))
+            for other in related:
+                if s.mask == other.mask:
+                    continue
+                if s.issubset(other):
+                    self.add_sentence(other.mask & ~s.mask, other.count - s.count)
+                elif other.issubset(s):
+                    self.add_sentence(s.mask & ~other.mask, s.count - other.count)
+
+class MinesweeperAI(Knowledge):
+    def __init__(self, h=8, w=8):
+        super().__init__(h, w)
+        self.moves_mask = 0
+
+        # Cells neither played nor known mines, removable in O(1)
+        self.candidates = list(range(h * w))
+        self.position = list(range(h * w))
+        self.tallies = {}  # frontier component -> configuration tallies
+
+    @property
+    def moves(self):
+        return set(self.cells(self.moves_mask))
+
+    @property
+    def mines(self):
+        return set(self.cells(self.mines_mask))
+
+    @property
+    def safe(self):
+        return set(self.cells(self.safe_mask))
+
+    def discard_candidate(self, k):
+        """Swap-remove cell index `k` from the random move candidates"""
+        pos = self.position[k]
+        if pos is None:
+            return
+        last = self.candidates.pop()
+        if last != k:
+            self.candidates[pos] = last
+            self.position[last] = pos
+        self.position[k] = None
+
+    def add_knowledge(self, cell, count):
+        self.moves_mask |= self.bit(cell)
+        self.discard_candidate(cell[0] * self.w + cell[1])
+        self.add_clue(cell, count)
+
+    def resolve(self, cell, is_mine):
+        if is_mine:
+            self.discard_candidate(cell[0] * self.w + cell[1])
+        super().resolve(cell, is_mine)
 
     def make_safe_move(self):
-        return (self.safe - self.moves).pop() if self.safe - self.moves else None
+        options = self.safe_mask & ~self.moves_mask
+        return next(self.cells(options & -options), None)
 
     def make_random_move(self):
-        options = [(i,j) for i in range(self.h) for j in range(self.w)
-                  if (i,j) not in self.moves and (i,j) not in self.mines]
-        return random.choice(options) if options else None
\ No newline at end of file
+        if not self.candidates:
+            return None
+        return divmod(random.choice(self.candidates), self.w)
+
+    def frontier_components(self):
+        """Group the sentences' cells into independent connected components"""
+        frontier = 0
+        for s in self.knowledge:
+            frontier |= s.mask
+        seen = set()
+        for start in self.cells(frontier):
+            if start in seen:
+                continue
+            seen.add(start)
+            cells, sentences, queue = [], set(), deque([start])
+            # Breadth-first, so constraints close early during enumeration
+            while queue:
+                cell = queue.popleft()
+                cells.append(cell)
+                for s in self.index[cell]:
+                    if s not in sentences:
+                        sentences.add(s)
+                        for other in self.cells(s.mask):
+                            if other not in seen:
+                                seen.add(other)
+                                queue.append(other)
+            yield cells, frozenset(sentences)
+
+    def component_tallies(self, cells, sentences):
+        """
+        Configurations of a frontier component by mine total, as lists of
+        configuration counts and of per-cell mine counts for each total.
+        """
+        if sentences in self.tallies:
+            return self.tallies[sentences]
+        n = len(cells)
+        position = {cell: i for i, cell in enumerate(cells)}
+        constraints = [
+            ([position[cell] for cell in self.cells(s.mask)], s.count)
+            for s in sentences
+        ]
+        if n <= MAX_COMPONENT:
+            totals = [0] * (n + 1)
+            per_cell = [[0] * n for _ in range(n + 1)]
+            for assignment in configurations(n, constraints):
+                k = sum(assignment)
+                totals[k] += 1
+                row = per_cell[k]
+                for i, value in enumerate(assignment):
+                    row[i] += value
+        else:
+            totals, per_cell = count_configurations(n, constraints)
+
+        if len(self.tallies) > 10000:
+            self.tallies.clear()
+        self.tallies[sentences] = totals, per_cell
+        return totals, per_cell
+
+    def mine_probabilities(self, total_mines=None):
+        """
+        Chance that each unknown cell is a mine, weighting frontier
+        configurations by the ways to place the remaining mines elsewhere
+        when `total_mines` is given.
+        """
+        components = list(self.frontier_components())
+        tallies = [self.component_tallies(*component) for component in components]
+        frontier = {cell for cells, _ in components for cell in cells}
+        known = self.moves_mask | self.safe_mask | self.mines_mask
+        interior = [
+            cell for cell in self.cells(self.board_mask & ~known)
+            if cell not in frontier
+        ]
+
+        # Weight of each component's mine total given all the others
+        U = len(interior)
+        remaining = None
+        if total_mines is not None:
+            remaining = total_mines - self.mines_mask.bit_count()
+            prefix = [[1]]
+            for totals, _ in tallies:
+                prefix.append(convolve(prefix[-1], totals))
+            suffix = [[1]]
+            for totals, _ in reversed(tallies):
+                suffix.append(convolve(suffix[-1], totals))
+            suffix.reverse()
+            weight = lambda K: comb(U, remaining - K) if 0 <= remaining - K <= U else 0
+            everything = prefix[-1]
+            Z = sum(ways * weight(K) for K, ways in enumerate(everything))
+            if not Z:
+                remaining = None  # Mine total inconsistent with the board
+
+        risks = {}
+        for c, ((cells, _), (totals, per_cell)) in enumerate(zip(components, tallies)):
+            if remaining is None:
+                factors = [1] * len(totals)
+                norm = sum(totals)
+            else:
+                others = convolve(prefix[c], suffix[c + 1])
+                factors = [
+                    sum(ways * weight(k + K) for K, ways in enumerate(others))
+                    for k in range(len(totals))
+                ]
+                norm = Z
+            for i, cell in enumerate(cells):
+                risks[cell] = sum(
+                    row[i] * factor for row, factor in zip(per_cell, factors)
+                ) / norm
+
+        if interior:
+            if remaining is None:
+                # Without a mine total, assume the frontier's density
+                risk = sum(risks.values()) / len(risks) if risks else 0.5
+            else:
+                risk = sum(
+                    ways * weight(K) * (remaining - K)
+                    for K, ways in enumerate(everything)
+                ) / Z / U
+            for cell in interior:
+                risks[cell] = risk
+        return risks
+
+    def make_informed_move(self, total_mines=None):
+        """Unplayed cell least likely to be a mine"""
+        risks = self.mine_probabilities(total_mines)
+        return min(risks, key=risks.get) if risks else None
+
+class MinesweeperStore:
+    """
+    Compact knowledge for many same-sized games: one slot per game in
+    parallel lists of bitboards, with each game's sentences packed 32 bits
+    apiece into an array. Every sentence is a subset of one clue's 3x3
+    neighborhood, so it packs as the top-left cell of a 3x3 block, the
+    block's 9-bit cell mask and the mine count. After 15 reveals a game
+    takes about 0.25 KB on 8x8 and 0.4 KB on 16x30, most of it the three
+    bitboards.
+    """
+
+    def __init__(self, h=8, w=8):
+        self.h, self.w = h, w
+        self.size = h * w
+        self.board_mask = (1 << self.size) - 1
+        # Shared by every game: each step loads a game in, infers, packs it back
+        self.engine = Knowledge(h, w)
+        self.moves, self.safe, self.mines = [], [], []
+        self.knowledge = []  # array of packed sentences per game
+        self.free = []  # released slots
+
+        # Board mask of each 9-bit block mask with the block at cell 0, and back
+        self.block_masks = [
+            sum(1 << (k // 3 * w + k % 3) for k in range(9) if block >> k & 1)
+            for block in range(512)
+        ]
+        self.blocks = {mask: block for block, mask in enumerate(self.block_masks)}
+
+    def new_game(self):
+        if self.free:
+            return self.free.pop()
+        for field in (self.moves, self.safe, self.mines):
+            field.append(0)
+        self.knowledge.append(array("I"))
+        return len(self.knowledge) - 1
+
+    def release(self, game):
+        self.moves[game] = self.safe[game] = self.mines[game] = 0
+        self.knowledge[game] = array("I")
+        self.free.append(game)
+
+    def pack(self, s):
+        """Sentence as block corner (above bit 13), block mask (bits 4-12) and count"""
+        low = (s.mask & -s.mask).bit_length() - 1
+        column = low % self.w
+        # The lowest cell is in the top row of the block, at most two columns in
+        for corner in range(low - min(column, 2), low + 1):
+            block = self.blocks.get(s.mask >> corner)
+            if block is not None:
+                return corner << 13 | block << 4 | s.count
+        raise ValueError("sentence does not fit in a 3x3 block")
+
+    def unpack(self, packed):
+        return Sentence(self.block_masks[packed >> 4 & 511] << (packed >> 13), packed & 15)
+
+    def cells(self, mask):
+        """Cells whose bits are set in `mask`"""
+        bits = bin(mask)[:1:-1]
+        return [divmod(k, self.w) for k, b in enumerate(bits) if b == "1"]
+
+    def step(self, games, reveals):
+        """
+        Record one revealed (cell, count) per game and infer what follows,
+        returning each game's next move: a safe cell if one is known,
+        otherwise a random unknown cell, or None once the board is done.
+        """
+        engine = self.engine
+        moves = []
+        for game, (cell, count) in zip(games, reveals):
+            self.moves[game] |= engine.bit(cell)
+            engine.load(self.safe[game], self.mines[game], map(self.unpack, self.knowledge[game]))
+            engine.add_clue(cell, count)
+
+            self.safe[game], self.mines[game] = engine.safe_mask, engine.mines_mask
+            self.knowledge[game] = array("I", map(self.pack, engine.knowledge))
+            moves.append(self.next_move(game))
+        return moves
+
+    def next_move(self, game):
+        options = self.safe[game] & ~self.moves[game]
+        if options:
+            return divmod((options & -options).bit_length() - 1, self.w)
+        unknown = self.board_mask & ~(self.moves[game] | self.mines[game])
+        if not unknown:
+            return None
+        # Guess cells until an unknown one turns up, then fall back to listing
+        for _ in range(32):
+            k = random.randrange(self.size)
+            if unknown >> k & 1:
+                return divmod(k, self.w)
+        return random.choice(self.cells(unknown))
+
+def play_game(h, w, mines, seed, informed=False):
+    """Play one seeded game, timing every add_knowledge call"""
+    game = Minesweeper(h, w, mines, seed)
+    ai = MinesweeperAI(h, w)
+    # Separate stream from the mine layout, or the first guess finds a mine
+    random.seed(f"ai-{seed}")
+    latencies, knowledge_sizes = [], []
+    won = False
+
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            # The first move has nothing to be informed by
+            if informed and ai.moves_mask:
+                move = ai.make_informed_move(mines)
+            else:
+                move = ai.make_random_move()
+        if move is None or game.is_mine(move):
+            break
+
+        start = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        latencies.append(time.perf_counter() - start)
+        knowledge_sizes.append(len(ai.knowledge))
+        if ai.moves_mask.bit_count() == h * w - mines:
+            won = True
+            break
+
+    return {"won": won, "latencies": latencies, "knowledge_sizes": knowledge_sizes}
+
+def _play_spec(spec):
+    return play_game(*spec)
+
+def benchmark(games=100, sizes=((8, 8), (16, 16), (16, 30)), densities=(0.15,),
+              informed=False, workers=None, seed=0):
+    """
+    Play `games` seeded games per board size and mine density, optionally
+    across a process pool, and report throughput, add_knowledge latency
+    percentiles, knowledge-base size and win rate for each configuration.
+    """
+    report = []
+    for h, w in sizes:
+        for density in densities:
+            mines = max(1, round(h * w * density))
+            specs = [(h, w, mines, seed + g, informed) for g in range(games)]
+            start = time.perf_counter()
+            if workers == 1:
+                results = list(map(_play_spec, specs))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_play_spec, specs))
+            elapsed = time.perf_counter() - start
+
+            latencies = [t for r in results for t in r["latencies"]]
+            sizes_seen = [n for r in results for n in r["knowledge_sizes"]]
+            percentiles = [0] * 99
+            if len(latencies) > 1:
+                percentiles = statistics.quantiles(latencies, n=100)
+            report.append({
+                "board": (h, w),
+                "mines": mines,
+                "games_per_sec": games / elapsed,
+                "latency_p50": percentiles[49],
+                "latency_p90": percentiles[89],
+                "latency_p99": percentiles[98],
+                "knowledge_mean": statistics.fmean(sizes_seen) if sizes_seen else 0,
+                "knowledge_peak": max(sizes_seen, default=0),
+                "win_rate": sum(r["won"] for r in results) / games,
+            })
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinesweeperAI headlessly")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", nargs=2, type=int, action="append", metavar=("H", "W"))
+    parser.add_argument("--density", type=float, action="append")
+    parser.add_argument("--informed", action="store_true")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = benchmark(
+        args.games,
+        sizes=args.size or ((8, 8), (16, 16), (16, 30)),
+        densities=args.density or (0.15,),
+        informed=args.informed,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    for row in report:
+        print(f"{row['board'][0]}x{row['board'][1]}, {row['mines']} mines: "
+              f"{row['games_per_sec']:.1f} games/s, "
+              f"add_knowledge p50/p90/p99 {1e6 * row['latency_p50']:.0f}/"
+              f"{1e6 * row['latency_p90']:.0f}/{1e6 * row['latency_p99']:.0f} us, "
+              f"knowledge mean {row['knowledge_mean']:.1f} peak {row['knowledge_peak']}, "
+              f"win rate {100 * row['win_rate']:.1f}%")
+
+
+if __name__ == "__main__":
+    main()